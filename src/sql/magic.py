@@ -32,7 +32,7 @@ import shlex
 import sql.connection
 import sql.parse
 from sql.run.run import run_statements
-from sql.parse import _option_strings_from_parser
+from sql.parse import _option_strings_set
 from sql import display, exceptions
 from sql.store import store
 from sql.command import SQLCommand
@@ -251,7 +251,7 @@ class SqlMagic(Magics, Configurable):
                     if breakLoop:
                         break
 
-            declared_argument = _option_strings_from_parser(SqlMagic.execute.parser)
+            declared_argument = _option_strings_set(SqlMagic.execute.parser)
             for check_argument in arguments:
                 if check_argument not in declared_argument:
                     raise exceptions.UsageError(
@@ -1,6 +1,7 @@
+import os
 import re
-import itertools
 import shlex
+from functools import lru_cache
 from os.path import expandvars
 from pathlib import Path
 import configparser
@@ -28,14 +29,68 @@ SQL_COMMANDS = [
     "describe",
 ]
 
+# The << operator: var << SQL or var= << SQL (returns the result too)
+_RE_SHOVEL = re.compile(r"\s*(?P<var>\w+)\s*(?P<eq>=)?\s*<< *(?P<sql>.*)", re.DOTALL)
+
+# Valid Python identifiers, used for :variable named parameters
+_IDENTIFIER = r"[a-zA-Z_][a-zA-Z0-9_]*"
+
+# Quoted strings, used in split_args_and_sql() to ignore filenames
+_RE_QUOTED = re.compile(r"'[^']*'|\"[^\"]*\"")
+
+# Any of the SQL_COMMANDS as a standalone (whitespace-delimited) word
+_RE_SQL_COMMAND = re.compile(
+    r"(?<!\S)(?:"
+    + "|".join(map(re.escape, sorted(SQL_COMMANDS, key=len, reverse=True)))
+    + r")(?!\S)",
+    re.IGNORECASE,
+)
+
+# ':variable' and ":variable" (the quote is captured so it has to match)
+_RE_QUOTED_VARIABLE = re.compile(r"(?<!\\)([\"']):(" + _IDENTIFIER + r")\1")
+
+# the name in :variable, matched right after the colon
+_RE_PARAMETER_NAME = re.compile(_IDENTIFIER + r"\b")
+
+# what ends each quoted string or comment skipped by find_named_parameters()
+_SKIPPED_REGION_END = {"'": "'", '"': '"', "--": "\n", "/*": "*/"}
+
+# the ":y]" part of string slicing notation: [x:y]
+_RE_STRING_SLICING = re.compile(r"(?<!\\):(\b[0-9_]*\b)\]")
+
+
+@lru_cache(maxsize=32)
+def _load_dsn(path, mtime, size):
+    """Read and parse a DSN file. mtime and size are not used to read the
+    file, they're part of the cache key so that editing the file invalidates
+    the cached parser. Use _read_dsn instead of calling this directly
+    """
+    parser = configparser.ConfigParser()
+    parser.read_string(Path(path).read_text())
+    return parser
+
+
+def _read_dsn(path_to_file):
+    """Return a parsed DSN file, reusing the previous result if the file
+    hasn't changed since it was last read. The returned parser is shared
+    across calls and must not be modified
+
+    Changes are detected by the file's mtime and size, so an edit that keeps
+    the same size and happens within the same timestamp tick as the previous
+    read (the resolution depends on the filesystem and kernel, it can be a few
+    milliseconds or more) returns the stale parser
+
+    Raises FileNotFoundError if the file does not exist and
+    configparser.Error if it cannot be parsed
+    """
+    path = os.path.abspath(path_to_file)
+    stat = os.stat(path)
+    return _load_dsn(path, stat.st_mtime_ns, stat.st_size)
+
 
 class ConnectionsFile:
     def __init__(self, path_to_file) -> None:
-        self.parser = configparser.ConfigParser()
-        dsn_file = Path(path_to_file)
-
-        cfg_content = dsn_file.read_text()
-        self.parser.read_string(cfg_content)
+        self.parser = _read_dsn(path_to_file)
 
     def get_default_connection_url(self):
         try:
@@ -47,6 +102,15 @@ class ConnectionsFile:
         return str(url.render_as_string(hide_password=False))
 
 
+def _dsn_file_not_found(path_to_file):
+    """Returns the error raised when the DSN file does not exist"""
+    return exceptions.FileNotFoundError(
+        f"%config SqlMagic.dsn_filename ({str(path_to_file)!r}) not found."
+        " Ensure the file exists or change the configuration: "
+        "%config SqlMagic.dsn_filename = 'path/to/file.ini'"
+    )
+
+
 def connection_str_from_dsn_section(section, config):
     """Return a SQLAlchemy connection string from a section in a DSN file
 
@@ -58,20 +122,10 @@ def connection_str_from_dsn_section(section, config):
     config : Config
         The config object, must have a dsn_filename attribute
     """
-    parser = configparser.ConfigParser()
-    dsn_file = Path(config.dsn_filename)
-
     try:
-        cfg_content = dsn_file.read_text()
+        parser = _read_dsn(config.dsn_filename)
     except FileNotFoundError as e:
-        raise exceptions.FileNotFoundError(
-            f"%config SqlMagic.dsn_filename ({str(config.dsn_filename)!r}) not found."
-            " Ensure the file exists or change the configuration: "
-            "%config SqlMagic.dsn_filename = 'path/to/file.ini'"
-        ) from e
-
-    try:
-        parser.read_string(cfg_content)
+        raise _dsn_file_not_found(config.dsn_filename) from e
     except configparser.Error as e:
         raise exceptions.RuntimeError(
             "An error happened when loading "
@@ -104,6 +158,19 @@ def connection_str_from_dsn_section(section, config):
     return str(url.render_as_string(hide_password=False))
 
 
+def _is_url(arg):
+    """Returns True if the string looks like a SQLAlchemy connection string"""
+    return "@" in arg or "://" in arg
+
+
+def _has_environment_variables(arg):
+    """
+    Returns True if the string may reference environment variables: $VARIABLE
+    (or %VARIABLE% on Windows), so expandvars can be skipped otherwise
+    """
+    return "$" in arg or (os.name == "nt" and "%" in arg)
+
+
 def _connection_string(arg, path_to_file):
     """
     Given a string, return a SQLAlchemy connection string if possible.
@@ -122,18 +189,25 @@ def _connection_string(arg, path_to_file):
     path_to_file : str
         The path to the DSN file
     """
+    if not arg:
+        return ""
+
     # for environment variables
-    arg = expandvars(arg)
+    if _has_environment_variables(arg):
+        arg = expandvars(arg)
 
     # if it's a URL, return it
-    if "@" in arg or "://" in arg:
+    if _is_url(arg):
         return arg
 
     # if it's a section in the DSN file, return the connection string
     if arg.startswith("[") and arg.endswith("]"):
         section = arg.lstrip("[").rstrip("]")
-        parser = configparser.ConfigParser()
-        parser.read(path_to_file)
+        try:
+            parser = _read_dsn(path_to_file)
+        except FileNotFoundError as e:
+            raise _dsn_file_not_found(path_to_file) from e
+
         cfg_dict = dict(parser.items(section))
         url = URL.create(**cfg_dict)
         url_ = str(url.render_as_string(hide_password=False))
@@ -179,6 +253,21 @@ def parse(arg, path_to_file):
     if not pieces:
         return result
 
+    # fast path: no environment variables, [section] or << operator, so
+    # the only thing left to do is check if the first word is a URL
+    if (
+        "<<" not in arg
+        and not _has_environment_variables(pieces[0])
+        and not pieces[0].startswith("[")
+    ):
+        if _is_url(pieces[0]):
+            result["connection"] = pieces[0]
+            result["sql"] = pieces[1] if len(pieces) > 1 else ""
+        else:
+            result["sql"] = arg
+
+        return result
+
     result["connection"] = _connection_string(pieces[0], path_to_file)
 
     if result["connection"]:
@@ -186,18 +275,11 @@ def parse(arg, path_to_file):
             return result
         arg = pieces[1]
 
-    pointer = arg.find("<<")
-    if pointer != -1:
-        left = arg[:pointer].replace(" ", "").replace("\n", "")
-        right = arg[pointer + 2 :].strip(" ")
-
-        if "=" in left:
-            result["result_var"] = left[:-1]
-            result["return_result_var"] = True
-        else:
-            result["result_var"] = left
-
-        result["sql"] = right
+    match = _RE_SHOVEL.match(arg)
+    if match:
+        result["result_var"] = match.group("var")
+        result["return_result_var"] = match.group("eq") is not None
+        result["sql"] = match.group("sql").rstrip(" ")
     else:
         result["sql"] = arg
     return result
@@ -212,8 +294,30 @@ def _option_strings_from_parser(parser):
     :param parser: [description]
     :type parser: IPython.core.magic_arguments.MagicArgumentParser
     """
-    opts = [a.option_strings for a in parser._actions]
-    return list(itertools.chain.from_iterable(opts))
+    return [opt for action in parser._actions for opt in action.option_strings]
+
+
+def _option_strings_set(parser):
+    """Returns the option strings from the parser as a frozenset
+
+    The set is computed once and cached on the parser in the
+    ``_jupysql_option_strings`` attribute, as a ``(n_actions, option_strings)``
+    tuple. ``n_actions`` is the number of actions the parser had when the set
+    was built, so the set is rebuilt if arguments are added afterwards
+
+    :param parser: The parser of a magic (e.g., ``SqlMagic.execute.parser``),
+        or any object with an argparse-like ``_actions`` list whose items have
+        an ``option_strings`` attribute
+    :type parser: IPython.core.magic_arguments.MagicArgumentParser
+    """
+    n_actions = len(parser._actions)
+    cached = getattr(parser, "_jupysql_option_strings", None)
+
+    if cached is None or cached[0] != n_actions:
+        cached = (n_actions, frozenset(_option_strings_from_parser(parser)))
+        setattr(parser, "_jupysql_option_strings", cached)
+
+    return cached[1]
 
 
 def without_sql_comment(parser, line):
@@ -223,16 +327,51 @@ def without_sql_comment(parser, line):
     but in SQL that delineates a comment.  So this removes comments
     so a line can safely be fed to the argparser.
 
+    The line is scanned once, splitting it into words the same way
+    shlex.split(line, posix=False) does: a quote only opens a quoted string
+    at the start of a word (so the apostrophe in O'Brien is a plain
+    character), and the closing quote ends the word (so 'bob'--comment is
+    two words). The first word outside quotes starting with -- that isn't a
+    known option string marks the beginning of the comment.
+
     :param line: A line of SQL, possibly mixed with option strings
     :type line: str
     """
 
-    args = _option_strings_from_parser(parser)
-    result = itertools.takewhile(
-        lambda word: (not word.startswith("--")) or (word in args),
-        shlex.split(line, posix=False),
-    )
-    return " ".join(result)
+    # most lines have no -- at all, so there's nothing to scan
+    if "--" not in line:
+        return line.strip()
+
+    args = _option_strings_set(parser)
+    quote = None
+    at_word_start = True
+
+    for i, char in enumerate(line):
+        if quote is not None:
+            # the closing quote also ends the current word
+            if char == quote:
+                quote, at_word_start = None, True
+
+            continue
+
+        if char.isspace():
+            at_word_start = True
+            continue
+
+        if at_word_start:
+            if char in ("'", '"'):
+                quote = char
+            elif line.startswith("--", i):
+                end = i
+                while end < len(line) and not line[end].isspace():
+                    end += 1
+
+                if line[i:end] not in args:
+                    return line[:i].strip()
+
+        at_word_start = False
+
+    return line.strip()
 
 
 def split_args_and_sql(line):
@@ -262,31 +401,23 @@ def split_args_and_sql(line):
     # When queries include filenames, they may include SQL keywords
     #   ex. 'penguins_selected'.csv contains "select"
     # In these cases, splitting the query leads to parsing errors.
-    # So we ignore any filenames by removing text between double quotes ""
-    # and single quotes '' below.
+    # So we ignore any filenames by blanking out text between double quotes ""
+    # and single quotes '' below. Quoted text is replaced with spaces so
+    # positions in the masked line match positions in the original line.
     # Note: This won't affect the query because we are only modifying the
     # text we use to check for SQL commands. Any splitting is done
     # on the original line which includes filenames.
-    line_no_filenames = re.sub(r"('.*')", "", line)  # 'file.csv' --> ''
-    line_no_filenames = re.sub(r'(".*")', "", line_no_filenames)  # "file.csv" --> ""
+    line_no_filenames = _RE_QUOTED.sub(lambda match: " " * len(match.group()), line)
 
-    # Now that filenames are removed, check the line for any SQL commands
+    # Identify beginning of sql query using keywords
     # If any SQL commands are found in the line, we split the line into args and sql.
     #   Note: lines without SQL commands will not be split
     #       ex. %sql duckdb:// or %sqlplot boxplot --table data.csv
-    if not any(cmd in line_no_filenames for cmd in SQL_COMMANDS):
-        return arg_line, sql_line
-
-    # Identify beginning of sql query using keywords
-    split_idx = -1
-    for token in line.split():
-        if token.lower() in SQL_COMMANDS:
-            # Found index at which to split line
-            split_idx = line.find(token)
-            break
+    match = _RE_SQL_COMMAND.search(line_no_filenames)
 
     # Split line into args and sql, beginning at sql keyword
-    if split_idx != -1:
+    if match:
+        split_idx = match.start()
         arg_line, sql_line = line[:split_idx], line[split_idx:]
 
     return arg_line, sql_line
@@ -307,8 +438,11 @@ def magic_args(magic_execute, line, cmd_from, allowed_duplicates=None):
 
     parsed = magic_execute.parser.parse_args(args)
 
+    # keep any positional arguments that appear before the SQL (e.g., a
+    # connection string or the << operator)
     if sql_line:
-        parsed.line = shlex.split(sql_line, posix=False)
+        positional = getattr(parsed, "line", None) or []
+        parsed.line = positional + shlex.split(sql_line, posix=False)
 
     return parsed
 
@@ -321,26 +455,21 @@ def escape_string_literals_with_colon_prefix(query):
     escape_string_slicing_with_colon_prefix(). It doesn't replace
     the occurrences of :variable (without quotes)
     """  # noqa
+    found = []
 
-    # Define the regular expression pattern for valid Python identifiers
-    identifier_pattern = r"\b[a-zA-Z_][a-zA-Z0-9_]*\b"
-
-    double_quoted_variable_pattern = r'(?<!\\)":(' + identifier_pattern + r')(?<!\\)"'
-
-    # Define the regular expression pattern for matching ':variable' format
-    single_quoted_variable_pattern = r"(?<!\\)':(" + identifier_pattern + r")(?<!\\)\'"
+    def escape(match):
+        quote, name = match.groups()
+        found.append(name)
+        return f"{quote}\\:{name}{quote}"
 
-    # Replace ":variable" and ':variable' with "\:variable"
-    query_quoted = re.sub(double_quoted_variable_pattern, r'"\\:\1"', query)
-    query_quoted = re.sub(single_quoted_variable_pattern, r"'\\:\1'", query_quoted)
-
-    double_found = re.findall(double_quoted_variable_pattern, query)
-    single_found = re.findall(single_quoted_variable_pattern, query)
+    # Replace ":variable" and ':variable' with "\:variable" and '\:variable',
+    # collecting the variable names in the same pass
+    query_quoted = _RE_QUOTED_VARIABLE.sub(escape, query)
 
     # Escape occurrences of : for string slicing
     query_quoted, _ = escape_string_slicing_notation(query_quoted)
 
-    return query_quoted, double_found + single_found
+    return query_quoted, found
 
 
 def escape_string_slicing_notation(query):
@@ -354,27 +483,69 @@ def escape_string_slicing_notation(query):
     query: str
         query to be parsed and cleaned
     """  # noqa
-    identifier_pattern = r"\b[0-9_]*\b"
-
-    # Define the regular expression pattern for matching [x:y]
-    string_slicing_pattern = r"(?<!\\):(" + identifier_pattern + r")(?<!\\)\]"
+    occurences_found = []
 
-    # Replace [x:y] with [x\:y]
-    query_escaped = re.sub(string_slicing_pattern, r"\\:\1]", query)
+    def escape(match):
+        occurences_found.append(match.group(1))
+        return f"\\:{match.group(1)}]"
 
-    occurences_found = re.findall(string_slicing_pattern, query)
+    # Replace [x:y] with [x\:y], collecting the y values in the same pass
+    query_escaped = _RE_STRING_SLICING.sub(escape, query)
 
     return query_escaped, occurences_found
 
 
 def find_named_parameters(input_string):
-    # Define the regular expression pattern for valid Python identifiers
-    identifier_pattern = r"\b[a-zA-Z_][a-zA-Z0-9_]*\b"
+    """
+    Returns the names of all :variable parameters in the input string. Anything
+    inside a quoted string or a comment (-- and /* */) is ignored, and so are
+    casts (::type) and escaped colons (\\:variable)
+
+    Instead of inspecting every character, this jumps straight to the next
+    colon, quote or comment using str.find
+    """
+    found = []
+    pos = 0
+
+    # next position of each token we care about (-1 if there are no more)
+    next_token = {
+        token: input_string.find(token) for token in (":", *_SKIPPED_REGION_END)
+    }
+
+    while True:
+        # only look again for the tokens we moved past
+        for token, idx in next_token.items():
+            if idx != -1 and idx < pos:
+                next_token[token] = input_string.find(token, pos)
+
+        candidates = [(idx, token) for token, idx in next_token.items() if idx != -1]
+
+        if not candidates:
+            break
+
+        idx, token = min(candidates)
+
+        if token != ":":
+            # skip the quoted string or comment, a quote inside a comment (or a
+            # comment marker inside a quote) is never looked at
+            end_token = _SKIPPED_REGION_END[token]
+            end = input_string.find(end_token, idx + len(token))
+
+            if end == -1:
+                break
+
+            pos = end + len(end_token)
+            continue
+
+        pos = idx + 1
+
+        if idx > 0 and input_string[idx - 1] in ":\\":
+            continue
 
-    # Define the regular expression pattern for matching :variable format
-    variable_pattern = r'(?<!["\'])\:(' + identifier_pattern + ")"
+        match = _RE_PARAMETER_NAME.match(input_string, pos)
 
-    # Use findall to extract all matches of :variable from the input string
-    matches = re.findall(variable_pattern, input_string)
+        if match:
+            found.append(match.group())
+            pos = match.end()
 
-    return matches
+    return found
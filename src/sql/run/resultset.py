@@ -16,6 +16,9 @@ from sql._current import _config_feedback_all
 
 from sql.exceptions import RuntimeError
 
+# table cells that start with two or more spaces, see _nonbreaking_spaces
+_RE_CELL_WITH_SPACES = re.compile(r"(<td>)( {2,})")
+
 
 class ResultSet(ColumnGuesserMixin):
     """
@@ -171,8 +174,7 @@ class ResultSet(ColumnGuesserMixin):
 
         # to create clickable links
         result = unescape(result)
-        _cell_with_spaces_pattern = re.compile(r"(<td>)( {2,})")
-        result = _cell_with_spaces_pattern.sub(_nonbreaking_spaces, result)
+        result = _RE_CELL_WITH_SPACES.sub(_nonbreaking_spaces, result)
 
         if self._config.displaylimit != 0 and not self._done_fetching():
             displaylimit_footer = (
@@ -10,6 +10,7 @@ from ploomber_core.dependencies import requires
 import ast
 from os.path import isfile
 import re
+from collections import Counter
 
 
 try:
@@ -184,7 +185,7 @@ def check_duplicate_arguments(
     boolean
         When there are no duplicates, a True bool is returned.
     """
-    allowed_duplicates = allowed_duplicates or []
+    allowed_duplicates = frozenset(allowed_duplicates or [])
     disallowed_aliases = disallowed_aliases or {}
 
     aliased_arguments = {}
@@ -220,15 +221,10 @@ def check_duplicate_arguments(
         elif arg.startswith("-"):
             single_hyphen_opts.add(arg)
 
-    # Get duplicate arguments
-    duplicate_args = []
-    visited_args = set()
-    for arg in args:
-        if arg not in allowed_duplicates:
-            if arg not in visited_args:
-                visited_args.add(arg)
-            else:
-                duplicate_args.append(arg)
+    # Get duplicate arguments (each one is reported once, no matter how many
+    # times it was repeated)
+    counts = Counter(arg for arg in args if arg not in allowed_duplicates)
+    duplicate_args = [arg for arg, count in counts.items() if count > 1]
 
     # Check if alias pairs are present and track the pair for the error message
     # Example: would filter out `-w` and `--with` if both are present
@@ -261,6 +261,11 @@ def test_is_sqlalchemy_error(string, substrings, expected):
             ["--creator", "--creator", "-c", "--persist", "--file", "-f", "-c"],
             [("c", "creator"), ("f", "file")],
         ),
+        # for repeated more than twice
+        (
+            ["--persist", "--persist", "--persist"],
+            [],
+        ),
     ],
 )
 def test_check_duplicate_arguments_raises_usageerror_for_sql_magic(